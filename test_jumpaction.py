@@ -0,0 +1,135 @@
+import tkinter as tk
+from collections import OrderedDict
+
+import pytest
+
+import jumpaction
+from jumpaction import swept_overlap
+
+# プレイヤーは地面の上で静止している（座標は [x1, y1, x2, y2]）
+PLAYER = [100, 400, 150, 450]
+
+
+@pytest.fixture
+def tk_root():
+    """画像を作るためのTkのウィンドウ。画面が無い環境ではテストをスキップする"""
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("画面（ディスプレイ）が無いため、Tkを使うテストはスキップする")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+def test_fast_obstacle_passing_through_player_is_detected():
+    """1フレームでプレイヤーを飛び越えて反対側まで移動した障害物も、衝突として判定される"""
+    assert swept_overlap(PLAYER, PLAYER, [200, 400, 240, 450], [0, 400, 40, 450])
+
+
+def test_near_miss_is_not_detected():
+    """プレイヤーの手前で止まった障害物や、プレイヤーの上を通り過ぎたコインは衝突しない"""
+    assert not swept_overlap(PLAYER, PLAYER, [200, 400, 240, 450], [160, 400, 200, 450])
+    assert not swept_overlap(PLAYER, PLAYER, [300, 360, 330, 390], [0, 360, 30, 390])
+
+
+def test_edge_contact_is_not_detected():
+    """辺がちょうど接しているだけでは、これまでの判定と同じく衝突としない"""
+    assert not swept_overlap(PLAYER, PLAYER, [150, 400, 190, 450], [150, 400, 190, 450])
+    assert not swept_overlap(PLAYER, PLAYER, [200, 400, 240, 450], [150, 400, 190, 450])
+
+
+def test_already_overlapping_at_start_is_detected():
+    """移動前の時点ですでに重なっていれば、衝突として判定される"""
+    assert swept_overlap(PLAYER, PLAYER, [140, 400, 180, 450], [140, 400, 180, 450])
+    assert swept_overlap(PLAYER, PLAYER, [140, 400, 180, 450], [40, 400, 80, 450])
+
+
+def test_sprite_cache_keeps_frames_on_screen(tk_root, monkeypatch):
+    """キャッシュが上限を超えたとき、表示中のコマは残し、表示していない最も古いコマを捨てる"""
+    monkeypatch.setattr(jumpaction, "sprite_sheets", {})
+    monkeypatch.setattr(jumpaction, "sprite_frames", OrderedDict())
+    monkeypatch.setattr(jumpaction, "sprite_items", {})
+
+    # 最初に作ったコマ（最も古いコマ）を画面に表示中として登録する
+    assert jumpaction.get_sprite_frame("coin", 0, 30, 30) is not None
+    jumpaction.sprite_items[1] = [2, "coin", 0, 30, 30]
+
+    # 上限までキャッシュを埋めてから、さらに1つ追加する
+    for width in range(1, jumpaction.SPRITE_CACHE_SIZE + 1):
+        jumpaction.get_sprite_frame("coin", 1, width, 30)
+
+    assert len(jumpaction.sprite_frames) == jumpaction.SPRITE_CACHE_SIZE
+    assert ("coin", 0, 30, 30) in jumpaction.sprite_frames
+    assert ("coin", 1, 1, 30) not in jumpaction.sprite_frames
+    assert ("coin", 1, 2, 30) in jumpaction.sprite_frames
+
+
+@pytest.fixture
+def run_history(tmp_path, monkeypatch):
+    """一時フォルダにプレイ記録のデータベースとハイスコアファイルを置き、テスト後に接続を閉じる"""
+    monkeypatch.setattr(jumpaction, "RUN_HISTORY_DB", str(tmp_path / "run_history.db"))
+    monkeypatch.setattr(jumpaction, "HIGHSCORE_FILE", str(tmp_path / "highscores.txt"))
+    monkeypatch.setattr(jumpaction, "run_history_db", None)
+    monkeypatch.setattr(jumpaction, "high_scores", None)
+    yield tmp_path
+    reopen_run_history()
+
+
+def reopen_run_history():
+    """開いているデータベースを閉じ、次の呼び出しで開き直されるようにする"""
+    if jumpaction.run_history_db is not None:
+        jumpaction.run_history_db.close()
+        jumpaction.run_history_db = None
+
+
+def count_runs():
+    """プレイ記録の件数と、カウンター（run_total）の値を返す"""
+    db = jumpaction.open_run_history()
+    stored = db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    total = db.execute("SELECT runs FROM run_total WHERE id = 0").fetchone()[0]
+    return stored, total
+
+
+def test_old_high_score_file_is_imported_on_first_open(run_history):
+    """初めてデータベースを開いたとき、以前のハイスコアファイルの内容が記録として取り込まれる"""
+    (run_history / "highscores.txt").write_text("50\n30\n")
+
+    assert count_runs() == (2, 2)
+    jumpaction.load_high_scores()
+    assert jumpaction.high_scores == [50, 30]
+
+
+def test_run_stats_after_record_run(run_history):
+    """記録を追加すると、順位（上位何%か）・自己ベスト・プレイ回数が正しく計算される。同じスコアは上位に数えない"""
+    jumpaction.record_runs([(10, 1.0, 0, 0), (20, 1.0, 0, 0), (20, 1.0, 0, 0), (30, 1.0, 0, 0)])
+    jumpaction.record_run(20, 2.0, 1, 0)
+
+    # 20より高いのは30の1件だけなので、5件中2位 = 上位40%
+    assert jumpaction.get_run_stats(20) == (40.0, 30, 5)
+
+    jumpaction.record_run(40, 3.0, 2, 0)
+    percentile, best, total = jumpaction.get_run_stats(40)
+    assert percentile == pytest.approx(100 / 6)
+    assert (best, total) == (40, 6)
+
+
+def test_load_high_scores_returns_top_five_in_descending_order(run_history):
+    """ハイスコアは、全記録の中から上位5件を高い順に取り出す"""
+    scores = [15, 80, 3, 42, 80, 7, 99, 23]
+    jumpaction.record_runs([(s, 1.0, 0, 0) for s in scores])
+
+    jumpaction.load_high_scores()
+    assert jumpaction.high_scores == [99, 80, 80, 42, 23]
+
+
+def test_reopening_database_does_not_import_again_or_reset_counter(run_history):
+    """記録が入っているデータベースを開き直しても、ハイスコアファイルを取り込み直したりカウンターを戻したりしない"""
+    (run_history / "highscores.txt").write_text("50\n30\n")
+    jumpaction.record_run(70, 1.0, 0, 0)
+    assert count_runs() == (3, 3)
+
+    reopen_run_history()
+    assert count_runs() == (3, 3)
+    jumpaction.record_run(10, 1.0, 0, 0)
+    assert count_runs() == (4, 4)